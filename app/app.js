@@ -5,7 +5,8 @@
   // State
   // ══════════════════════════════════════════════════════════════════════════
 
-  let words = [];           // Array of [word, start, end]
+  let words = [];           // Array of word strings
+  let wordStarts = new Int32Array(0);  // Start time of each word, in ms
   let currentIndex = 0;
   let currentWord = "";
   let isPlaying = false;
@@ -294,8 +295,7 @@
   }
 
   function addBookmark(position, label) {
-    const wordAtPos = words[findWordAtTime(position)];
-    const wordText = wordAtPos ? wordAtPos[0] : "";
+    const wordText = words[findWordAtTime(position)] || "";
     const ch = chapters.length ? chapters[findChapterAtTime(position)] : null;
     const chapterTitle = ch ? ch.title : "";
 
@@ -303,7 +303,7 @@
     const idx = findWordAtTime(position);
     const contextWords = [];
     for (let i = Math.max(0, idx - 2); i < Math.min(words.length, idx + 5); i++) {
-      contextWords.push(words[i][0]);
+      contextWords.push(words[i]);
     }
 
     const bookmark = {
@@ -425,7 +425,7 @@
     const idx = findWordAtTime(pos);
     const contextWords = [];
     for (let i = Math.max(0, idx - 2); i < Math.min(words.length, idx + 5); i++) {
-      contextWords.push(words[i][0]);
+      contextWords.push(words[i]);
     }
     bookmarkNamePreview.textContent = `${formatTime(pos)}${chName ? " · " + chName : ""} — "${contextWords.join(" ")}"`;
     bookmarkNameInput.value = "";
@@ -512,7 +512,7 @@
     const idx = findWordAtTime(globalTime);
     if (idx !== currentIndex || !currentWord) {
       currentIndex = idx;
-      currentWord = words[idx] ? words[idx][0] : "";
+      currentWord = words[idx] || "";
       draw();
     }
     updateProgressUI(globalTime);
@@ -556,14 +556,15 @@
   function findWordAtTime(time) {
     // Binary search for the word at the given time
     if (!words.length) return 0;
+    const timeMs = time * 1000;
     let lo = 0, hi = words.length - 1;
     let best = 0;
 
     while (lo <= hi) {
       const mid = (lo + hi) >>> 1;
-      const wordStart = words[mid][1];
+      const wordStart = wordStarts[mid];
 
-      if (wordStart <= time) {
+      if (wordStart <= timeMs) {
         best = mid;
         lo = mid + 1;
       } else {
@@ -601,7 +602,7 @@
     const idx = findWordAtTime(time);
     if (idx !== currentIndex) {
       currentIndex = idx;
-      currentWord = words[idx] ? words[idx][0] : "";
+      currentWord = words[idx] || "";
       draw();
     }
 
@@ -740,7 +741,7 @@
     // Previous words
     const prevWords = [];
     for (let i = Math.max(0, currentIndex - 6); i < currentIndex; i++) {
-      prevWords.push(words[i][0]);
+      prevWords.push(words[i]);
     }
     if (prevWords.length) {
       ctx.fillText(prevWords.join("  "), innerWidth / 2, centerY - mainSize * 0.85);
@@ -749,7 +750,7 @@
     // Next words
     const nextWords = [];
     for (let i = currentIndex + 1; i < Math.min(words.length, currentIndex + 7); i++) {
-      nextWords.push(words[i][0]);
+      nextWords.push(words[i]);
     }
     if (nextWords.length) {
       ctx.fillText(nextWords.join("  "), innerWidth / 2, centerY + mainSize * 0.85);
@@ -955,6 +956,7 @@
     }
     audioParts = [];
     words = [];
+    wordStarts = new Int32Array(0);
     chapters = [];
     currentIndex = 0;
     currentWord = "";
@@ -1012,19 +1014,42 @@
     loadingText.textContent = "Loading alignment data...";
 
     try {
-      // Load from the book's directory
-      const dataUrl = `../books/${slug}/alignment_compact.json`;
-      const resp = await fetch(dataUrl);
-      if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
-      const data = await resp.json();
+      // Load from the book's directory: the word text and start times come
+      // as columns (one word per line, little-endian int32 milliseconds), so
+      // there is no JSON to parse and no per-word array to allocate
+      const base = `../books/${slug}`;
+      const [metaResp, wordsResp, startsResp, chaptersResp] = await Promise.all([
+        fetch(`${base}/meta.json`),
+        fetch(`${base}/words.txt`),
+        fetch(`${base}/starts.bin`),
+        fetch(`${base}/chapters_mapped.json`),
+      ]);
+      let data = metaResp.ok ? await metaResp.json() : {};
+
+      if (wordsResp.ok && startsResp.ok && data.parts) {
+        words = (await wordsResp.text()).split("\n");
+        words.pop(); // every word is newline-terminated
+        wordStarts = new Int32Array(await startsResp.arrayBuffer());
+      } else {
+        // Books preprocessed before the word columns existed
+        const resp = await fetch(`${base}/alignment_compact.json`);
+        if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+        data = await resp.json();
+        words = data.words.map((w) => w[0]); // [[word, start, end], ...]
+        wordStarts = Int32Array.from(data.words, (w) => Math.round(w[1] * 1000));
+      }
 
       bookTitleEl.textContent = `${data.title} — ${data.author}`;
-      words = data.words; // [[word, start, end], ...]
       totalDuration = data.total_duration;
 
-      // Load chapters if available
-      if (data.chapters && data.chapters.length) {
-        chapters = data.chapters;
+      // Load chapters if available: map_chapters.py writes them to a sidecar,
+      // older books have them embedded in alignment_compact.json
+      let bookChapters = data.chapters;
+      if (chaptersResp.ok) {
+        bookChapters = (await chaptersResp.json()).chapters;
+      }
+      if (bookChapters && bookChapters.length) {
+        chapters = bookChapters;
         buildChapterList();
         buildChapterMarkers();
         if (chaptersBtn) chaptersBtn.style.display = "";
@@ -1037,7 +1062,7 @@
       buildBookmarkMarkers();
 
       if (words.length > 0) {
-        currentWord = words[0][0];
+        currentWord = words[0];
         currentIndex = 0;
       }
 
@@ -4,7 +4,7 @@ Map EPUB chapter boundaries to audio timestamps.
 
 Reads chapters.json (from EPUB) and alignment_compact.json (from Whisper),
 matches each chapter's opening text to the transcribed word stream, and
-writes the chapter timestamps back into alignment_compact.json.
+writes the chapter timestamps to chapters_mapped.json next to it.
 
 Usage:
     python map_chapters.py <book-directory>
@@ -15,10 +15,17 @@ Example:
 
 import argparse
 import json
+import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 
+import numpy as np
+
 # Minimum chapter text length (characters) to consider a real chapter
 MIN_CHAPTER_TEXT_LEN = 200
 
@@ -28,20 +35,166 @@ MATCH_WINDOW = 15
 # Minimum ratio of matched words to consider a valid match
 MIN_MATCH_RATIO = 0.5
 
+# How many window positions find_chapter_start() scores per vectorized pass
+SEARCH_BLOCK = 65536
+
+# Everything that isn't a lowercase letter or digit is dropped by normalize()
+_NORM_RE = re.compile(r"[^a-z0-9]")
+
+# A whitespace-delimited word, as str.split() would yield it
+_WORD_RE = re.compile(r"\S+")
+
 
+@lru_cache(maxsize=None)
 def normalize(word: str) -> str:
     """Normalize a word for fuzzy comparison: lowercase, strip punctuation."""
-    return re.sub(r"[^a-z0-9]", "", word.lower())
+    return _NORM_RE.sub("", word.lower())
+
+
+def extract_words(text: str, limit: int | None = None) -> list[str]:
+    """Split text into normalized words, stopping after `limit` words if given."""
+    normalized = (normalize(m.group()) for m in _WORD_RE.finditer(text))
+    return list(islice((w for w in normalized if w), limit))
+
 
+@dataclass
+class WordStream:
+    """The normalized transcription, encoded as integer ids for vectorized matching."""
 
-def extract_words(text: str) -> list[str]:
-    """Split text into normalized words."""
-    return [normalize(w) for w in text.split() if normalize(w)]
+    vocab: dict[str, int]  # normalized word -> id
+    prefixes: dict[str, int]  # 3-letter prefix -> id
+    ids: np.ndarray  # word id at each position
+    vocab_prefix_ids: np.ndarray  # prefix id of each vocab word (-1 under 3 letters)
+    # Inverted index: order[offsets[i]:offsets[i + 1]] are the positions of word id i
+    order: np.ndarray
+    offsets: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def positions(self, word_id: int) -> np.ndarray:
+        """Sorted positions at which word_id occurs in the stream."""
+        return self.order[self.offsets[word_id]:self.offsets[word_id + 1]]
+
+
+def encode_stream(normed_words: list[str]) -> WordStream:
+    """Intern every normalized word (and its 3-letter prefix) as a small int."""
+    vocab: dict[str, int] = {}
+    prefixes: dict[str, int] = {}
+    ids = np.fromiter(
+        (vocab.setdefault(w, len(vocab)) for w in normed_words),
+        dtype=np.int32,
+        count=len(normed_words),
+    )
+    vocab_prefix_ids = np.fromiter(
+        (prefixes.setdefault(w[:3], len(prefixes)) if len(w) > 2 else -1 for w in vocab),
+        dtype=np.int32,
+        count=len(vocab),
+    )
+    # A stable sort keeps each word's positions in stream order
+    order = np.argsort(ids, kind="stable")
+    offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ids, minlength=len(vocab)), out=offsets[1:])
+    return WordStream(vocab, prefixes, ids, vocab_prefix_ids, order, offsets)
+
+
+def score_tables(chapter_words: list[str], stream: WordStream) -> list[np.ndarray]:
+    """
+    Build one lookup table per chapter word, indexed by transcribed word id.
+
+    Entries are in half-points: 2 for the word itself, 1 for a word sharing its
+    3-letter prefix, 0 otherwise. Scoring a window column is then a single
+    gather instead of two comparisons and a select.
+    """
+    tables = []
+    for w in chapter_words:
+        if len(w) > 2 and w[:3] in stream.prefixes:
+            table = (stream.vocab_prefix_ids == stream.prefixes[w[:3]]).astype(np.int16)
+        else:
+            table = np.zeros(len(stream.vocab), dtype=np.int16)
+        if w in stream.vocab:
+            table[stream.vocab[w]] = 2
+        tables.append(table)
+    return tables
+
+
+def window_points(tables: list[np.ndarray], stream: WordStream, starts: np.ndarray) -> np.ndarray:
+    """Score (in half-points) the windows beginning at each of the given positions."""
+    points = np.zeros(len(starts), dtype=np.int16)
+    for j, table in enumerate(tables):
+        points += table[stream.ids[starts + j]]
+    return points
+
+
+def scan_windows(
+    tables: list[np.ndarray],
+    stream: WordStream,
+    search_from: int,
+    search_end: int,
+    beat: int = 0,
+) -> tuple[int, int]:
+    """
+    Score every window starting in [search_from, search_end).
+
+    Windows are scored a block at a time. Windows that can no longer beat the
+    best score so far (initially `beat` points) are dropped as soon as that is
+    certain, and the scan stops after the first block holding a perfect match.
+
+    Returns (word_index, points) of the first best window, or (-1, 0) if no
+    window scores more than `beat`.
+    """
+    perfect = 2 * len(tables)
+    best_idx = -1
+    best_points = beat
+
+    # Reused across blocks so the inner loop allocates nothing
+    points_buf = np.empty(SEARCH_BLOCK, dtype=np.int16)
+    column_buf = np.empty(SEARCH_BLOCK, dtype=np.int16)
+
+    for lo in range(search_from, search_end, SEARCH_BLOCK):
+        hi = min(lo + SEARCH_BLOCK, search_end)
+        points = points_buf[:hi - lo]
+        column = column_buf[:hi - lo]
+        points.fill(0)
+        # Offsets (within the block) of the windows still able to beat
+        # best_points; None while every window in the block is still scored
+        offsets = None
+
+        for j, table in enumerate(tables):
+            if offsets is None:
+                # mode="clip" lets take() write straight into `out` (ids are always in range)
+                np.take(table, stream.ids[lo + j:hi + j], out=column, mode="clip")
+                points += column
+            else:
+                points += table[stream.ids[offsets + (lo + j)]]
+
+            # Drop windows that can't beat the best so far even if all their
+            # remaining words match exactly. Nothing can be dropped until the
+            # points left to win fall below the best score.
+            remaining = 2 * (len(tables) - j - 1)
+            if remaining < best_points:
+                keep = np.flatnonzero(points + remaining > best_points)
+                offsets = keep if offsets is None else offsets[keep]
+                points = points[keep]
+                if not len(offsets):
+                    break
+
+        if len(points):
+            k = int(points.argmax())
+            if points[k] > best_points:
+                best_points = int(points[k])
+                best_idx = lo + (k if offsets is None else int(offsets[k]))
+        if best_points == perfect:
+            break
+
+    if best_idx < 0:
+        return -1, 0
+    return best_idx, best_points
 
 
 def find_chapter_start(
     chapter_words: list[str],
-    transcribed_words: list[list],
+    stream: WordStream,
     search_from: int,
     search_limit: int | None = None,
 ) -> tuple[int, float]:
@@ -50,6 +203,15 @@ def find_chapter_start(
 
     Uses a sliding window approach: for each position in the word stream,
     count how many of the first N chapter words match the transcribed words.
+    An exact word match counts 1, a shared 3-letter prefix counts 0.5 (handles
+    minor transcription errors).
+
+    Windows lining up with an occurrence of the rarest of those chapter words
+    (the one with the fewest positions in the stream's inverted index) are
+    scored first. A perfect one among them is the answer (every perfect window
+    contains that word); otherwise their best score seeds the scan of the whole
+    range, so it can drop most windows almost at once and still returns the
+    first best window, as a plain scan would.
 
     Returns (word_index, score) or (-1, 0) if no good match found.
     """
@@ -57,30 +219,80 @@ def find_chapter_start(
     if n < 3:
         return -1, 0.0
 
-    search_end = len(transcribed_words) - n
+    search_end = len(stream) - n
     if search_limit is not None:
         search_end = min(search_end, search_from + search_limit)
 
-    best_idx = -1
-    best_score = 0.0
+    tables = score_tables(chapter_words[:n], stream)
+    # Scores are kept in half-points so they stay integers
+    perfect = 2 * n
+    beat = 0
+
+    anchors = [
+        (len(stream.positions(stream.vocab[w])), j)
+        for j, w in enumerate(chapter_words[:n])
+        if w in stream.vocab
+    ]
+    if anchors:
+        _, anchor_j = min(anchors)
+        occurrences = stream.positions(stream.vocab[chapter_words[anchor_j]])
+        lo, hi = np.searchsorted(occurrences, [search_from + anchor_j, search_end + anchor_j])
+        starts = occurrences[lo:hi] - anchor_j
+        if len(starts):
+            points = window_points(tables, stream, starts)
+            k = int(points.argmax())
+            if points[k] == perfect:
+                return int(starts[k]), 1.0
+            # Windows scoring at least as well, including this one, still count
+            beat = max(int(points[k]) - 1, 0)
+
+    best_idx, best_points = scan_windows(tables, stream, search_from, search_end, beat)
+    return best_idx, best_points / perfect
+
+
+# The book's WordStream, inside a chapter-search worker process
+_worker_stream: WordStream | None = None
+
+
+def _init_search_worker(stream: WordStream) -> None:
+    """Worker initializer: receive the stream once instead of with every chapter."""
+    global _worker_stream
+    _worker_stream = stream
 
-    for i in range(search_from, search_end):
-        matches = 0
-        for j in range(n):
-            tw = normalize(transcribed_words[i + j][0])
-            cw = chapter_words[j]
-            if tw == cw:
-                matches += 1
-            elif len(tw) > 2 and len(cw) > 2 and (tw.startswith(cw[:3]) or cw.startswith(tw[:3])):
-                # Partial match for words that are close (handles minor transcription errors)
-                matches += 0.5
 
-        score = matches / n
-        if score > best_score:
-            best_score = score
-            best_idx = i
+def _search_whole_book(chapter_words: list[str]) -> tuple[int, float]:
+    """Run find_chapter_start() for one chapter over the entire stream."""
+    return find_chapter_start(chapter_words, _worker_stream, 0)
 
-    return best_idx, best_score
+
+def load_transcription(book_dir: Path) -> tuple[list[str], np.ndarray, float]:
+    """
+    Load the transcribed words, their start times (seconds) and the total duration.
+
+    Reads the word columns (words.txt, starts.bin) and meta.json written by
+    preprocess.py when present, so the big word list in alignment_compact.json
+    never has to be parsed; books processed before those existed fall back to it.
+    """
+    words_file = book_dir / "words.txt"
+    starts_file = book_dir / "starts.bin"
+    meta_file = book_dir / "meta.json"
+
+    if words_file.exists() and starts_file.exists() and meta_file.exists():
+        with open(meta_file) as f:
+            total_duration = json.load(f)["total_duration"]
+        # Every word is newline-terminated, so the last split item is empty.
+        # newline="\n": a "\r" inside a word must not become a line break
+        with open(words_file, encoding="utf-8", newline="\n") as f:
+            words = f.read().split("\n")[:-1]
+        starts = np.fromfile(starts_file, dtype="<i4") / 1000
+        return words, starts, total_duration
+
+    with open(book_dir / "alignment_compact.json") as f:
+        alignment = json.load(f)
+    triples = alignment["words"]  # [[word, start, end], ...]
+    words = [w[0] for w in triples]
+    starts = np.array([w[1] for w in triples], dtype=np.float64)
+    return words, starts, alignment["total_duration"]
 
 
 def main():
@@ -101,6 +313,7 @@ def main():
 
     chapters_file = book_dir / "chapters.json"
     alignment_file = book_dir / "alignment_compact.json"
+    mapped_file = book_dir / "chapters_mapped.json"
 
     print("=" * 60)
     print("Chapter Timestamp Mapper")
@@ -117,11 +330,10 @@ def main():
 
     with open(chapters_file) as f:
         chapters = json.load(f)
-    with open(alignment_file) as f:
-        alignment = json.load(f)
+    words, starts, total_duration = load_transcription(book_dir)
 
-    words = alignment["words"]  # [[word, start, end], ...]
-    total_duration = alignment["total_duration"]
+    # Normalize and encode the transcription once up front rather than per window
+    stream = encode_stream([normalize(w) for w in words])
 
     print(f"  Chapters from EPUB: {len(chapters)}")
     print(f"  Transcribed words:  {len(words)}")
@@ -140,12 +352,26 @@ def main():
     print(f"\n  Chapters to map: {len(filtered)}")
     print()
 
+    # Only the opening words are ever matched, so don't normalize the rest
+    all_chapter_words = [extract_words(ch["text"], MATCH_WINDOW) for ch in filtered]
+
+    # Searched over the whole book, chapters are independent of each other, so
+    # search them all in parallel up front. The in-order pass below only has to
+    # search again when a match lands before the previous chapter's.
+    jobs = [i for i, cw in enumerate(all_chapter_words) if len(cw) >= 3]
+    whole_book_matches = {}
+    if jobs:
+        workers = min(len(jobs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(workers, initializer=_init_search_worker, initargs=(stream,)) as ex:
+            results = ex.map(_search_whole_book, [all_chapter_words[i] for i in jobs])
+            whole_book_matches = dict(zip(jobs, results))
+
     # Match each chapter to the word stream
     mapped_chapters = []
     search_from = 0
 
     for i, ch in enumerate(filtered):
-        chapter_words = extract_words(ch["text"])
+        chapter_words = all_chapter_words[i]
         if len(chapter_words) < 3:
             print(f"  [{i+1}/{len(filtered)}] '{ch['title']}' — too few words, skipping")
             continue
@@ -155,10 +381,12 @@ def main():
         remaining = len(words) - search_from
         search_limit = max(remaining, 50000)
 
-        word_idx, score = find_chapter_start(chapter_words, words, search_from, search_limit)
+        word_idx, score = whole_book_matches[i]
+        if 0 <= word_idx < search_from:
+            word_idx, score = find_chapter_start(chapter_words, stream, search_from, search_limit)
 
         if word_idx >= 0 and score >= MIN_MATCH_RATIO:
-            start_time = words[word_idx][1]
+            start_time = float(starts[word_idx])
             mapped_chapters.append({
                 "title": ch["title"],
                 "start_time": round(start_time, 3),
@@ -192,14 +420,12 @@ def main():
             ch["end_time"] = round(total_duration, 3)
             ch["end_word_index"] = len(words)
 
-    # Write back into alignment_compact.json
-    alignment["chapters"] = mapped_chapters
-
-    with open(alignment_file, "w") as f:
-        json.dump(alignment, f)
+    # Write to a small sidecar rather than rewriting the (much larger)
+    # alignment file; the reader merges the two when it loads the book
+    with open(mapped_file, "w") as f:
+        json.dump({"chapters": mapped_chapters}, f, indent=2)
 
-    print(f"\n  Updated {alignment_file} with chapter data")
-    print(f"  File size: {alignment_file.stat().st_size / 1024 / 1024:.1f} MB")
+    print(f"\n  Saved chapter data to {mapped_file}")
 
     # Also update meta.json if it exists
     meta_file = book_dir / "meta.json"
@@ -223,7 +449,7 @@ def main():
         print(f"  {i+1:<4} {ch['title']:<35} {start_fmt:>10} {dur_fmt:>10}")
 
     print("\n" + "=" * 60)
-    print("Done! Chapter data is now embedded in alignment_compact.json")
+    print(f"Done! Chapter data is now in {mapped_file.name}")
     print("=" * 60)
 
 
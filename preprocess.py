@@ -16,66 +16,180 @@ The book directory should contain:
     - An EPUB file (.epub)
 
 Output files are written to the book directory:
-    - alignment.json          Full word-level alignment
+    - alignment.json          Full word-level alignment (only with --keep-verbose)
     - alignment_compact.json  Compact format for the web reader
+    - words.txt, starts.bin,  The same words as parallel columns: one word per
+      ends.bin                line, and int32 start/end times in milliseconds
     - chapters.json           Extracted EPUB chapters
     - meta.json               Book metadata for the library
 """
 
 import argparse
+import codecs
+import gzip
 import json
 import os
 import sys
 import re
-import subprocess
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
+import numpy as np
+
 # Force unbuffered output
 sys.stdout.reconfigure(line_buffering=True)
 sys.stderr.reconfigure(line_buffering=True)
 
 from ebooklib import epub
 from bs4 import BeautifulSoup
-from faster_whisper import WhisperModel
+from bs4.dammit import EncodingDetector
+from lxml import etree
+from faster_whisper import BatchedInferencePipeline, WhisperModel, decode_audio
+from faster_whisper.vad import VadOptions, get_speech_timestamps
 
 
 # ── Configuration ──────────────────────────────────────────────────────────────
 
-# Whisper model: "large-v3" for best quality, "base" for fast processing
-# "base" provides good word-level timestamps at 10-20x realtime speed
-WHISPER_MODEL = "base"
+# Whisper model: "large-v3-turbo" is large-v3's encoder with a 4-layer decoder,
+# so it keeps most of large-v3's accuracy (and word timing) at a fraction of
+# the decode cost; with int8 weights it fits in ~3 GB of VRAM. Preprocessing
+# runs once per book, so accuracy is worth more than speed here.
+# "base" is still the fastest option (pass --model base)
+WHISPER_MODEL = "large-v3-turbo"
 DEVICE = "cuda"
-COMPUTE_TYPE = "float16"  # Use float16 for RTX 4060
+# int8 weights with float16 activations: half the weight bandwidth of float16
+# and int8 tensor-core kernels, at essentially the same accuracy
+COMPUTE_TYPE = "int8_float16"
+
+# Speech chunks decoded per GPU call by the batched pipeline (--batch-size);
+# larger batches keep the GPU busier, lower it if you run out of VRAM
+BATCH_SIZE = 16
+
+# Whisper's input format: mono float32 samples at 16 kHz
+SAMPLE_RATE = 16000
+# Whisper's input window; VAD speech chunks are capped to it
+CHUNK_LENGTH = 30
+
+# Silence (ms) that splits speech chunks in the VAD pass
+VAD_MIN_SILENCE_MS = 300
 
 AUDIO_EXTENSIONS = {".m4b", ".m4a", ".mp3", ".mp4", ".ogg", ".flac", ".wav"}
 
 
 # ── EPUB Text Extraction ──────────────────────────────────────────────────────
 
+# libxml2's forgiving HTML parser; one per (worker) process, reused per document.
+# Given bytes with no <?xml encoding?> or <meta charset>, it assumes Latin-1,
+# but EPUB XHTML is UTF-8. Documents that are, or say they are, in another
+# encoding never reach it (see is_utf8_document)
+HTML_PARSER = etree.HTMLParser(encoding="utf-8")
+
+
+def is_utf8_document(content: bytes) -> bool:
+    """
+    Whether content is UTF-8 as far as its markup says: no UTF-16 BOM, and
+    either no declared encoding (EPUB's default) or a declared UTF-8.
+    """
+    if content.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return False
+    declared = EncodingDetector.find_declared_encoding(content, is_html=True)
+    if declared is None:
+        return True
+    try:
+        return codecs.lookup(declared).name == "utf-8"
+    except LookupError:
+        return False
+
+
+def parse_document(content: bytes) -> tuple[str, str | None]:
+    r"""
+    Return the visible text of an EPUB XHTML document and its first heading.
+
+    Walks a plain lxml.etree tree (C parser, XPath, text iteration) rather
+    than lxml.html's, whose per-element class lookup makes walking the tree
+    noticeably slower. Documents that aren't UTF-8 (UTF-16, or declaring
+    another encoding), and documents lxml refuses to parse or finds empty, go
+    through BeautifulSoup instead.
+
+    The result matches parse_document_soup()'s, also for documents that
+    don't declare their encoding or declare a non-UTF-8 one (run with
+    python -m doctest preprocess.py):
+
+    >>> parse_document(b"<h2>Na\xc3\xafve</h2><p>caf\xc3\xa9</p>")
+    ('Naïve café', 'Naïve')
+    >>> parse_document_soup(b"<h2>Na\xc3\xafve</h2><p>caf\xc3\xa9</p>")
+    ('Naïve café', 'Naïve')
+    >>> latin1 = b'<?xml version="1.0" encoding="iso-8859-1"?><h2>Caf\xe9</h2><p>na\xefve</p>'
+    >>> parse_document(latin1)
+    ('Café naïve', 'Café')
+    >>> parse_document_soup(latin1)
+    ('Café naïve', 'Café')
+    """
+    if not is_utf8_document(content):
+        return parse_document_soup(content)
+
+    try:
+        tree = etree.fromstring(content, HTML_PARSER)
+    except (etree.LxmlError, ValueError):
+        tree = None
+    if tree is None:
+        return parse_document_soup(content)
+
+    # Remove scripts, styles. Clearing (rather than dropping) them keeps their
+    # tail text a separate string, as BeautifulSoup's decompose() does
+    for el in tree.xpath("//script|//style|//noscript"):
+        el.clear(keep_tail=True)
+
+    text = " ".join(s for s in (t.strip() for t in tree.itertext()) if s)
+
+    # Try to extract chapter title
+    title = None
+    for heading in tree.xpath("//h1|//h2|//h3"):
+        t = "".join(s.strip() for s in heading.itertext())
+        if t:
+            title = t
+            break
+
+    return text, title
+
+
+def parse_document_soup(content: bytes) -> tuple[str, str | None]:
+    """BeautifulSoup version of parse_document(), for malformed documents."""
+    soup = BeautifulSoup(content, "lxml")
+
+    # Remove scripts, styles
+    for tag in soup.find_all(["script", "style", "noscript"]):
+        tag.decompose()
+
+    text = soup.get_text(separator=" ", strip=True)
+
+    # Try to extract chapter title
+    title = None
+    for heading in soup.find_all(["h1", "h2", "h3"]):
+        t = heading.get_text(strip=True)
+        if t:
+            title = t
+            break
+
+    return text, title
+
+
 def extract_epub_text(epub_path: Path) -> list[dict]:
     """Extract text from EPUB, returning a list of chapters with title and text."""
     book = epub.read_epub(str(epub_path))
+    items = list(book.get_items_of_type(9))  # ITEM_DOCUMENT
     chapters = []
 
-    for item in book.get_items_of_type(9):  # ITEM_DOCUMENT
-        soup = BeautifulSoup(item.get_content(), "lxml")
-
-        # Remove scripts, styles
-        for tag in soup.find_all(["script", "style", "noscript"]):
-            tag.decompose()
+    # Parsing is CPU-bound and each document is independent, so spread the
+    # documents over all cores; map() keeps them in book order
+    workers = max(1, min(len(items), os.cpu_count() or 1))
+    with ProcessPoolExecutor(workers) as ex:
+        parsed = list(ex.map(parse_document, [item.get_content() for item in items]))
 
-        text = soup.get_text(separator=" ", strip=True)
+    for item, (text, title) in zip(items, parsed):
         if not text or len(text.strip()) < 50:
             continue
 
-        # Try to extract chapter title
-        title = None
-        for heading in soup.find_all(["h1", "h2", "h3"]):
-            t = heading.get_text(strip=True)
-            if t:
-                title = t
-                break
-
         chapters.append({
             "title": title or f"Chapter {len(chapters) + 1}",
             "text": text,
@@ -85,48 +199,77 @@ def extract_epub_text(epub_path: Path) -> list[dict]:
     return chapters
 
 
-# ── Audio Conversion ──────────────────────────────────────────────────────────
+# ── Transcription with Word Timestamps ────────────────────────────────────────
 
-def convert_m4b_to_wav(m4b_path: Path, wav_path: Path) -> Path:
-    """Convert M4B to WAV using ffmpeg for processing."""
-    if wav_path.exists():
-        print(f"  WAV already exists: {wav_path}", flush=True)
-        return wav_path
+def load_audio(audio_path: Path) -> np.ndarray:
+    """
+    Decode an audio file to Whisper's input format (16 kHz mono float32).
 
-    print(f"  Converting {m4b_path.name} -> {wav_path.name}...", flush=True)
-    subprocess.run(
-        [
-            "ffmpeg", "-i", str(m4b_path),
-            "-ar", "16000",  # 16kHz for Whisper
-            "-ac", "1",      # mono
-            "-c:a", "pcm_s16le",
-            str(wav_path),
-        ],
-        check=True,
-        capture_output=True,
-    )
-    print(f"  Done: {wav_path}", flush=True)
-    return wav_path
+    Decoding once up front gives the part's exact duration for free
+    (len / SAMPLE_RATE, the timeline the timestamps refer to) and hands
+    faster-whisper samples it doesn't have to decode again.
+    """
+    print(f"  Decoding {audio_path.name}...", flush=True)
+    return decode_audio(str(audio_path), sampling_rate=SAMPLE_RATE)
 
 
-# ── Transcription with Word Timestamps ────────────────────────────────────────
+def detect_speech(audio: np.ndarray) -> list[dict]:
+    """
+    Find the speech chunks in decoded audio with faster-whisper's Silero VAD,
+    as the clip list (start/end in seconds) transcribe_audio() takes.
 
-def transcribe_audio(model: WhisperModel, audio_path: Path, time_offset: float = 0.0) -> list[dict]:
+    This is the VAD pass vad_filter=True runs inside the pipeline, with the
+    same options. Silero runs on the CPU (single-threaded ONNX), so doing it
+    separately lets it run while the GPU transcribes the previous part.
     """
-    Transcribe audio file and return word-level timestamps.
+    options = VadOptions(
+        min_silence_duration_ms=VAD_MIN_SILENCE_MS,
+        max_speech_duration_s=CHUNK_LENGTH,
+    )
+    return [
+        {"start": c["start"] / SAMPLE_RATE, "end": c["end"] / SAMPLE_RATE}
+        for c in get_speech_timestamps(audio, options)
+    ]
+
+
+def prepare_part(audio_path: Path) -> tuple[np.ndarray, list[dict]]:
+    """Decode an audio part and find its speech: everything before the GPU's turn."""
+    audio = load_audio(audio_path)
+    speech = detect_speech(audio)
+    print(f"  {audio_path.name}: decoded, {len(speech)} speech chunks", flush=True)
+    return audio, speech
+
+
+def transcribe_audio(
+    pipeline: BatchedInferencePipeline,
+    audio: np.ndarray,
+    speech: list[dict],
+    name: str,
+    time_offset: float = 0.0,
+    batch_size: int = BATCH_SIZE,
+) -> list[tuple[str, float, float]]:
+    """
+    Transcribe decoded audio (see prepare_part) and return word-level timestamps.
+    Only the speech chunks found by detect_speech() are sent through the model.
+    name (the audio file's) is only used in progress output.
+    Words are (word, start, end) tuples, the same shape the compact alignment stores.
     time_offset is added to all timestamps (for multi-part audiobooks).
     """
-    print(f"  Transcribing {audio_path.name}...", flush=True)
+    print(f"  Transcribing {name}...", flush=True)
     print(f"  (This may take a while for long audiobooks)", flush=True)
 
-    segments, info = model.transcribe(
-        str(audio_path),
+    segments, _ = pipeline.transcribe(
+        audio,
+        batch_size=batch_size,
         beam_size=1,
         word_timestamps=True,
         language="en",
+        clip_timestamps=speech,
+        # Only used if no speech was found, in which case the pipeline
+        # runs the same VAD pass itself
         vad_filter=True,
         vad_parameters=dict(
-            min_silence_duration_ms=300,
+            min_silence_duration_ms=VAD_MIN_SILENCE_MS,
         ),
     )
 
@@ -138,32 +281,117 @@ def transcribe_audio(model: WhisperModel, audio_path: Path, time_offset: float =
         if segment_count % 50 == 0:
             print(f"    Processed {segment_count} segments ({segment.end:.1f}s / {segment.end/3600:.2f}h)...", flush=True)
 
-        if segment.words:
-            for w in segment.words:
-                words.append({
-                    "word": w.word.strip(),
-                    "start": round(w.start + time_offset, 3),
-                    "end": round(w.end + time_offset, 3),
-                })
+        # Whitespace-only words have nothing to show, so they are dropped.
+        # Timestamps are rounded to ms only when written (append_word_columns)
+        for w in segment.words or ():
+            text = w.word.strip()
+            if text:
+                words.append((text, w.start + time_offset, w.end + time_offset))
 
     print(f"  Transcription complete: {len(words)} words, {segment_count} segments", flush=True)
     return words
 
 
-def get_audio_duration(audio_path: Path) -> float:
-    """Get the duration of an audio file in seconds using ffprobe."""
-    result = subprocess.run(
-        [
-            "ffprobe", "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            str(audio_path),
-        ],
-        capture_output=True,
-        text=True,
-        check=True,
-    )
-    return float(result.stdout.strip())
+def load_model(model_name: str, device: str, compute_type: str) -> WhisperModel:
+    """
+    Load the Whisper model. GPUs without efficient int8_float16 kernels (pre-Turing)
+    reject that compute type, in which case plain int8 is used instead.
+    """
+    try:
+        return WhisperModel(model_name, device=device, compute_type=compute_type)
+    except ValueError as e:
+        # CTranslate2's "Requested int8_float16 compute type, but the target
+        # device or backend do not support efficient int8_float16 computation";
+        # anything else (e.g. a mistyped model name) is a real error
+        if compute_type != "int8_float16" or "int8_float16" not in str(e):
+            raise
+        print(f"  {e}", flush=True)
+        print("  Falling back to compute type int8", flush=True)
+        return WhisperModel(model_name, device=device, compute_type="int8")
+
+
+# ── Columnar Word Output ──────────────────────────────────────────────────────
+
+WORD_COLUMNS = ("words.txt", "starts.bin", "ends.bin")
+
+# Suffix of the columns while they are being written; see finish_word_columns
+PARTIAL_SUFFIX = ".part"
+
+
+def append_word_columns(
+    book_dir: Path, words: list[tuple[str, float, float]], suffix: str = "",
+) -> None:
+    """
+    Append words to three parallel columns instead of one list of triples.
+
+    words.txt has one word per line; starts.bin and ends.bin are little-endian
+    int32 timestamps, rounded to milliseconds (the precision the alignment
+    files have always had). Loading these needs no JSON parsing and no
+    per-word objects.
+    Each part is appended as soon as it is transcribed, so the book's words
+    are never all in memory. main() appends to the PARTIAL_SUFFIX names, so
+    the reader and map_chapters.py never see a half-written set of columns.
+    """
+    with open(book_dir / ("words.txt" + suffix), "a", encoding="utf-8", newline="\n") as f:
+        f.writelines(w.replace("\n", " ") + "\n" for w, _, _ in words)
+    for col, name in ((1, "starts.bin"), (2, "ends.bin")):
+        ms = np.fromiter((round(w[col] * 1000) for w in words), dtype="<i4", count=len(words))
+        with open(book_dir / (name + suffix), "ab") as f:
+            ms.tofile(f)
+
+
+def finish_word_columns(book_dir: Path) -> None:
+    """Move the columns written under PARTIAL_SUFFIX names into place."""
+    for name in WORD_COLUMNS:
+        os.replace(book_dir / (name + PARTIAL_SUFFIX), book_dir / name)
+
+
+def iter_word_columns(book_dir: Path, suffix: str = "", chunk_size: int = 65536):
+    """Yield the (word, start, end) triples in the word columns, in lists of up to chunk_size."""
+    with (
+        open(book_dir / ("words.txt" + suffix), encoding="utf-8", newline="\n") as words_f,
+        open(book_dir / ("starts.bin" + suffix), "rb") as starts_f,
+        open(book_dir / ("ends.bin" + suffix), "rb") as ends_f,
+    ):
+        while True:
+            starts = np.fromfile(starts_f, dtype="<i4", count=chunk_size)
+            if not len(starts):
+                return
+            ends = np.fromfile(ends_f, dtype="<i4", count=len(starts))
+            words = [words_f.readline()[:-1] for _ in range(len(starts))]
+            yield list(zip(words, (starts / 1000).tolist(), (ends / 1000).tolist()))
+
+
+def write_alignment_json(path: Path, header: dict, word_chunks, **dump_kwargs) -> None:
+    """
+    Write header's fields followed by a "words" array, encoding one chunk of
+    words at a time; the output is what json.dump() of the whole dict gives.
+    """
+    item_sep, key_sep = dump_kwargs.get("separators", (", ", ": "))
+    first = True
+    with open(path, "w") as f:
+        f.write(json.dumps(header, **dump_kwargs)[:-1])
+        f.write(f'{item_sep}"words"{key_sep}[')
+        for chunk in word_chunks:
+            if not chunk:
+                continue
+            if not first:
+                f.write(item_sep)
+            f.write(json.dumps(chunk, **dump_kwargs)[1:-1])
+            first = False
+        f.write("]}")
+
+
+def write_gzip_copy(path: Path) -> None:
+    """
+    Write a gzip-compressed copy next to path (path + ".gz").
+
+    serve.py sends it instead of the original to browsers that accept gzip.
+    Word lists repeat heavily, so this is several times smaller, and level 9
+    costs nothing that matters in a one-off preprocessing run.
+    """
+    data = gzip.compress(path.read_bytes(), compresslevel=9, mtime=0)
+    path.with_name(path.name + ".gz").write_bytes(data)
 
 
 # ── Book Directory Discovery ─────────────────────────────────────────────────
@@ -179,6 +407,15 @@ def discover_book_files(book_dir: Path) -> tuple[list[Path], Path | None]:
         if f.is_file() and f.suffix.lower() in AUDIO_EXTENSIONS
     )
 
+    # Earlier versions converted every part to a 16 kHz .wav next to it; now
+    # that parts are decoded directly, such leftovers would be transcribed a
+    # second time as extra parts
+    converted = {f.stem for f in audio_files if f.suffix.lower() != ".wav"}
+    audio_files = [
+        f for f in audio_files
+        if not (f.suffix.lower() == ".wav" and f.stem in converted)
+    ]
+
     epub_files = sorted(
         f for f in book_dir.iterdir()
         if f.is_file() and f.suffix.lower() == ".epub"
@@ -244,6 +481,23 @@ def main():
         default=DEVICE,
         help=f"Device to use (default: {DEVICE})",
     )
+    parser.add_argument(
+        "--compute-type",
+        type=str,
+        default=COMPUTE_TYPE,
+        help=f"CTranslate2 compute type, e.g. float16 or int8 for CPU (default: {COMPUTE_TYPE})",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BATCH_SIZE,
+        help=f"Speech chunks transcribed per GPU call; lower it if VRAM runs out (default: {BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--keep-verbose",
+        action="store_true",
+        help="Also write alignment.json, the verbose word list (for debugging)",
+    )
     args = parser.parse_args()
 
     book_dir = args.book_dir.resolve() if not args.book_dir.is_absolute() else args.book_dir
@@ -293,7 +547,7 @@ def main():
     # Step 1: Extract EPUB text (if available)
     chapters = []
     if epub_file:
-        print("\n[1/4] Extracting text from EPUB...", flush=True)
+        print("\n[1/2] Extracting text from EPUB...", flush=True)
         chapters = extract_epub_text(epub_file)
         print(f"  Found {len(chapters)} chapters", flush=True)
         for i, ch in enumerate(chapters):
@@ -306,53 +560,62 @@ def main():
             json.dump(chapters, f, indent=2)
         print(f"  Saved to {chapters_file}", flush=True)
     else:
-        print("\n[1/4] Skipping EPUB extraction (no EPUB file found)", flush=True)
-
-    # Step 2: Convert audio files to WAV
-    print("\n[2/4] Converting audiobook files...", flush=True)
-    wav_files = []
-    for af in audio_files:
-        if af.suffix.lower() == ".wav":
-            wav_files.append(af)
-        else:
-            wav = af.with_suffix(".wav")
-            convert_m4b_to_wav(af, wav)
-            wav_files.append(wav)
-
-    # Step 3: Get durations for offset calculation
-    print("\n[3/4] Getting audio durations...", flush=True)
-    durations = []
-    for af in audio_files:
-        dur = get_audio_duration(af)
-        durations.append(dur)
-        print(f"  {af.name}: {dur:.1f}s ({dur/3600:.1f}h)", flush=True)
-
-    # Step 4: Transcribe with word timestamps
+        print("\n[1/2] Skipping EPUB extraction (no EPUB file found)", flush=True)
+
+    # Step 2: Transcribe with word timestamps
     whisper_model = args.model
     device = args.device
-    print(f"\n[4/4] Loading Whisper model and transcribing...", flush=True)
-    print(f"  Model: {whisper_model}, Device: {device}, Compute: {COMPUTE_TYPE}", flush=True)
-
-    model = WhisperModel(whisper_model, device=device, compute_type=COMPUTE_TYPE)
-    print("  Model loaded!", flush=True)
-
-    all_words = []
-    time_offset = 0.0
-
-    for i, (wav, af) in enumerate(zip(wav_files, audio_files)):
-        part_num = i + 1
-        print(f"\n  == Part {part_num}/{len(wav_files)} ==", flush=True)
-        words = transcribe_audio(model, wav, time_offset=time_offset)
-        all_words.extend(words)
-        time_offset += durations[i]
-
-    # Save word-level alignment to book directory
-    alignment_file = book_dir / "alignment.json"
-    alignment_data = {
+    compute_type = args.compute_type
+    batch_size = args.batch_size
+    print(f"\n[2/2] Loading Whisper model and transcribing...", flush=True)
+    print(f"  Model: {whisper_model}, Device: {device}, Compute: {compute_type}, Batch: {batch_size}", flush=True)
+
+    # Decoding and VAD are CPU work: a background thread prepares the first
+    # part while the model loads, then each next part while the GPU
+    # transcribes the current one. Only one part is prepared ahead, since
+    # decoded audio is ~230 MB per hour
+    with ThreadPoolExecutor(max_workers=1) as prep:
+        next_part = prep.submit(prepare_part, audio_files[0])
+
+        model = load_model(whisper_model, device, compute_type)
+        # Batches VAD-split speech chunks through the model instead of decoding
+        # the audio one 30s window at a time
+        pipeline = BatchedInferencePipeline(model=model)
+        print("  Model loaded!", flush=True)
+
+        # Words are appended to the columns part by part (see append_word_columns),
+        # under temporary names until the last part is done. Clear any left
+        # over from an interrupted run
+        for name in WORD_COLUMNS:
+            (book_dir / (name + PARTIAL_SUFFIX)).unlink(missing_ok=True)
+
+        word_count = 0
+        durations = []
+        time_offset = 0.0
+
+        for i, af in enumerate(audio_files):
+            part_num = i + 1
+            audio, speech = next_part.result()
+            if part_num < len(audio_files):
+                next_part = prep.submit(prepare_part, audio_files[part_num])
+            print(f"\n  == Part {part_num}/{len(audio_files)} ==", flush=True)
+            dur = len(audio) / SAMPLE_RATE
+            words = transcribe_audio(
+                pipeline, audio, speech, af.name, time_offset=time_offset, batch_size=batch_size,
+            )
+            del audio
+            append_word_columns(book_dir, words, PARTIAL_SUFFIX)
+            word_count += len(words)
+            del words
+            durations.append(dur)
+            print(f"  {af.name}: {dur:.1f}s ({dur/3600:.1f}h)", flush=True)
+            time_offset += dur
+
+    # Book-level fields shared by the alignment files
+    alignment_header = {
         "title": meta["title"],
         "author": meta["author"],
         "slug": meta["slug"],
-        "audio_files": [str(f) for f in audio_files],
         "total_duration": sum(durations),
         "parts": [
             {
@@ -362,38 +625,57 @@ def main():
             }
             for i in range(len(audio_files))
         ],
-        "word_count": len(all_words),
-        "words": all_words,
+        "word_count": word_count,
     }
 
-    with open(alignment_file, "w") as f:
-        json.dump(alignment_data, f)
-    print(f"\n  Alignment saved to {alignment_file}", flush=True)
-    print(f"  Total words: {len(all_words)}", flush=True)
-    print(f"  File size: {os.path.getsize(alignment_file) / 1024 / 1024:.1f} MB", flush=True)
-
-    # Also save a compact version for faster loading
+    # Save the compact alignment to book directory, reading the words back from
+    # the columns. Compact format: [word, start, end] arrays, and no whitespace
+    # after separators: a tenth of the file for millions of triples
     compact_file = book_dir / "alignment_compact.json"
-    compact_data = {
-        "title": alignment_data["title"],
-        "author": alignment_data["author"],
-        "slug": alignment_data["slug"],
-        "total_duration": alignment_data["total_duration"],
-        "parts": alignment_data["parts"],
-        "word_count": alignment_data["word_count"],
-        # Compact format: [word, start, end] arrays
-        "words": [[w["word"], w["start"], w["end"]] for w in all_words],
-    }
-    with open(compact_file, "w") as f:
-        json.dump(compact_data, f)
-    print(f"  Compact alignment saved to {compact_file}", flush=True)
+    write_alignment_json(
+        compact_file,
+        alignment_header,
+        iter_word_columns(book_dir, PARTIAL_SUFFIX),
+        separators=(",", ":"),
+    )
+    print(f"\n  Compact alignment saved to {compact_file}", flush=True)
+    print(f"  Total words: {word_count}", flush=True)
     print(f"  Compact size: {os.path.getsize(compact_file) / 1024 / 1024:.1f} MB", flush=True)
 
-    # Save book metadata
+    # The verbose list-of-dicts form isn't read by anything, so only write it on request
+    if args.keep_verbose:
+        alignment_file = book_dir / "alignment.json"
+        write_alignment_json(
+            alignment_file,
+            {**alignment_header, "audio_files": [str(f) for f in audio_files]},
+            (
+                [{"word": w, "start": s, "end": e} for w, s, e in chunk]
+                for chunk in iter_word_columns(book_dir, PARTIAL_SUFFIX)
+            ),
+        )
+        print(f"  Alignment saved to {alignment_file}", flush=True)
+        print(f"  File size: {os.path.getsize(alignment_file) / 1024 / 1024:.1f} MB", flush=True)
+
+    # Chapter timestamps from an earlier map_chapters.py run point into the
+    # previous transcription, so they are stale now. So is the old meta.json
+    # (parts, duration); until the new one is written below, the reader and
+    # map_chapters.py fall back to the alignment_compact.json just written
+    (book_dir / "chapters_mapped.json").unlink(missing_ok=True)
     meta_file = book_dir / "meta.json"
+    meta_file.unlink(missing_ok=True)
+
+    finish_word_columns(book_dir)
+    # The columns the reader downloads
+    for name in ("words.txt", "starts.bin"):
+        write_gzip_copy(book_dir / name)
+    print(f"  Word columns saved to {book_dir / 'words.txt'}, starts.bin, ends.bin", flush=True)
+
+    # Save book metadata
     meta["total_duration"] = sum(durations)
-    meta["word_count"] = len(all_words)
+    meta["word_count"] = word_count
     meta["parts_count"] = len(audio_files)
+    # The reader takes the audio parts from here when it loads the word columns
+    meta["parts"] = alignment_header["parts"]
     meta["has_chapters"] = len(chapters) > 0
     with open(meta_file, "w") as f:
         json.dump(meta, f, indent=2)
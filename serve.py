@@ -10,15 +10,60 @@ from pathlib import Path
 
 PORT = 8080
 
+# Header fields of alignment_compact.json, for books without a meta.json
+_TITLE_RE = re.compile(rb'"title"\s*:\s*"([^"]*)"')
+_AUTHOR_RE = re.compile(rb'"author"\s*:\s*"([^"]*)"')
+_DURATION_RE = re.compile(rb'"total_duration"\s*:\s*([\d.]+)')
+_WORD_COUNT_RE = re.compile(rb'"word_count"\s*:\s*(\d+)')
+
+# Last scan_books() result, with the books_state() it was computed from
+_books_cache = (None, [])
+
+
+def _mtime_ns(path) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def books_state(books_path: Path) -> tuple:
+    """
+    Modification times scan_books() output depends on: the books directory,
+    each book directory (files added/removed) and each book's meta.json and
+    alignment_compact.json (rewritten in place). Stats only, no reads.
+    """
+    entries = sorted(
+        (
+            entry.name,
+            _mtime_ns(entry.path),
+            _mtime_ns(os.path.join(entry.path, "meta.json")),
+            _mtime_ns(os.path.join(entry.path, "alignment_compact.json")),
+        )
+        for entry in os.scandir(books_path)
+        if entry.is_dir()
+    )
+    return (str(books_path.resolve()), _mtime_ns(books_path), tuple(entries))
+
 
 def scan_books(books_dir: str = "books") -> list[dict]:
-    """Scan the books directory for processed books and return their metadata."""
-    books = []
+    """
+    Scan the books directory for processed books and return their metadata.
+
+    The result is cached until books_state() changes, so repeated library
+    requests don't re-read every book's metadata.
+    """
+    global _books_cache
     books_path = Path(books_dir)
 
     if not books_path.is_dir():
-        return books
+        return []
+
+    state = books_state(books_path)
+    if _books_cache[0] == state:
+        return _books_cache[1]
 
+    books = []
     for entry in sorted(books_path.iterdir()):
         if not entry.is_dir():
             continue
@@ -50,18 +95,18 @@ def scan_books(books_dir: str = "books") -> list[dict]:
         else:
             # Try to read basic info from alignment_compact.json header
             try:
-                with open(alignment_file) as f:
+                with open(alignment_file, "rb") as f:
                     # Only read the first part to avoid loading the huge words array
                     raw = f.read(2048)
                     # Find title and author from the beginning of the JSON
-                    title_match = re.search(r'"title"\s*:\s*"([^"]*)"', raw)
-                    author_match = re.search(r'"author"\s*:\s*"([^"]*)"', raw)
-                    duration_match = re.search(r'"total_duration"\s*:\s*([\d.]+)', raw)
-                    word_count_match = re.search(r'"word_count"\s*:\s*(\d+)', raw)
+                    title_match = _TITLE_RE.search(raw)
+                    author_match = _AUTHOR_RE.search(raw)
+                    duration_match = _DURATION_RE.search(raw)
+                    word_count_match = _WORD_COUNT_RE.search(raw)
                     if title_match:
-                        meta["title"] = title_match.group(1)
+                        meta["title"] = title_match.group(1).decode("utf-8", "replace")
                     if author_match:
-                        meta["author"] = author_match.group(1)
+                        meta["author"] = author_match.group(1).decode("utf-8", "replace")
                     if duration_match:
                         meta["total_duration"] = float(duration_match.group(1))
                     if word_count_match:
@@ -71,6 +116,7 @@ def scan_books(books_dir: str = "books") -> list[dict]:
 
         books.append(meta)
 
+    _books_cache = (state, books)
     return books
 
 
@@ -86,6 +132,11 @@ class CORSHandler(http.server.SimpleHTTPRequestHandler):
         ".woff2": "font/woff2",
     }
 
+    # Set TCP_NODELAY on each connection (socketserver does it in setup()),
+    # so the headers and the start of a Range response go out immediately
+    # instead of waiting on Nagle's algorithm
+    disable_nagle_algorithm = True
+
     def end_headers(self):
         self.send_header("Accept-Ranges", "bytes")
         self.send_header("Access-Control-Allow-Origin", "*")
@@ -124,6 +175,8 @@ class CORSHandler(http.server.SimpleHTTPRequestHandler):
         # Check for Range header
         range_header = self.headers.get("Range")
         if not range_header:
+            if self.send_gzip_copy(path):
+                return
             return super().do_GET()
 
         # Parse range
@@ -147,26 +200,78 @@ class CORSHandler(http.server.SimpleHTTPRequestHandler):
             http.server.SimpleHTTPRequestHandler.end_headers(self)
 
             with open(path, "rb") as f:
-                f.seek(start)
-                remaining = length
-                buf_size = 64 * 1024
-                while remaining > 0:
-                    chunk = f.read(min(buf_size, remaining))
-                    if not chunk:
-                        break
-                    self.wfile.write(chunk)
-                    remaining -= len(chunk)
+                self.send_file_range(f, start, length)
         except Exception:
             return super().do_GET()
 
+    def send_file_range(self, f, offset: int, count: int) -> None:
+        """
+        Send count bytes of the open file f, starting at offset.
+
+        Uses os.sendfile() where available, so the kernel moves the bytes
+        from the page cache to the socket in one call; falls back to copying
+        through Python in 64 KB chunks where it isn't (or the OS refuses it).
+        """
+        if hasattr(os, "sendfile"):
+            try:
+                while count > 0:
+                    sent = os.sendfile(self.connection.fileno(), f.fileno(), offset, count)
+                    if sent == 0:
+                        return
+                    offset += sent
+                    count -= sent
+                return
+            except ConnectionError:
+                raise
+            except OSError:
+                pass  # Not supported for this file/socket, copy the rest below
+
+        f.seek(offset)
+        buf_size = 64 * 1024
+        while count > 0:
+            chunk = f.read(min(buf_size, count))
+            if not chunk:
+                break
+            self.wfile.write(chunk)
+            count -= len(chunk)
+
+    def send_gzip_copy(self, path: str) -> bool:
+        """
+        Send the precompressed path + ".gz" (written by preprocess.py) with
+        Content-Encoding: gzip, if the client accepts gzip and the copy is
+        not older than the file. Returns False if nothing was sent.
+        """
+        if "gzip" not in self.headers.get("Accept-Encoding", ""):
+            return False
+        gz_path = path + ".gz"
+        try:
+            gz_stat = os.stat(gz_path)
+            if gz_stat.st_mtime < os.stat(path).st_mtime:
+                return False
+            f = open(gz_path, "rb")
+        except OSError:
+            return False
+
+        with f:
+            self.send_response(200)
+            self.send_header("Content-Type", self.guess_type(path))
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(gz_stat.st_size))
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            self.send_file_range(f, 0, gz_stat.st_size)
+        return True
+
 
 def main():
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
     # Serve from app/ but with access to parent for audio files
     # We serve from the project root so audio files are accessible
+    # One thread per connection, so a long audio stream (or a slow client)
+    # doesn't hold up every other request
     handler = CORSHandler
-    server = http.server.HTTPServer(("0.0.0.0", PORT), handler)
+    server = http.server.ThreadingHTTPServer(("0.0.0.0", PORT), handler)
 
     print(f"\n  Speed AudioReader Server")
     print(f"  ─────────────────────────")